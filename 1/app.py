@@ -1,5 +1,8 @@
+from concurrent.futures import ProcessPoolExecutor
+import mmap
+import os
 from pathlib import Path
-from typing import Optional, Generator
+from typing import Dict, List, NamedTuple, Optional, Generator, Tuple
 
 phonetic_to_digit = {
     "one": 1,
@@ -23,6 +26,63 @@ phonetic_to_digit = {
 }
 
 
+class PhoneticAutomaton(NamedTuple):
+    # Aho-Corasick automaton: goto[state][char] is the next state, fail[state]
+    # the longest proper suffix state, outputs[state] the (length, digit) of
+    # every pattern ending in that state
+    goto: List[Dict[str, int]]
+    fail: List[int]
+    outputs: List[Tuple[Tuple[int, int], ...]]
+
+
+def build_phonetic_automaton(patterns: Dict[str, int]) -> PhoneticAutomaton:
+    goto = [{}]
+    outputs = [()]
+    for pattern, digit in patterns.items():
+        state = 0
+        for char in pattern:
+            if char not in goto[state]:
+                goto.append({})
+                outputs.append(())
+                goto[state][char] = len(goto) - 1
+            state = goto[state][char]
+        outputs[state] += ((len(pattern), digit),)
+
+    # breadth first, so the fail state of a parent is known before its children
+    fail = [0] * len(goto)
+    queue = list(goto[0].values())
+    for state in queue:
+        for char, next_state in goto[state].items():
+            fallback = fail[state]
+            while fallback != 0 and char not in goto[fallback]:
+                fallback = fail[fallback]
+            fail[next_state] = goto[fallback].get(char, 0)
+            outputs[next_state] += outputs[fail[next_state]]
+            queue.append(next_state)
+    return PhoneticAutomaton(goto=goto, fail=fail, outputs=outputs)
+
+
+phonetic_automaton = build_phonetic_automaton(phonetic_to_digit)
+
+
+def first_and_last_phonetic_digit(s: str) -> Tuple[Optional[int], Optional[int]]:
+    # single pass, overlapping words like "eightwo" yield both digits
+    first, last = None, None
+    first_start, last_start = len(s), -1
+    state = 0
+    for index, char in enumerate(s):
+        while state != 0 and char not in phonetic_automaton.goto[state]:
+            state = phonetic_automaton.fail[state]
+        state = phonetic_automaton.goto[state].get(char, 0)
+        for length, digit in phonetic_automaton.outputs[state]:
+            start = index - length + 1
+            if start < first_start:
+                first, first_start = digit, start
+            if start > last_start:
+                last, last_start = digit, start
+    return first, last
+
+
 def first_phonetic_digit(s: str) -> Optional[int]:
     first_occurance_digit = {}
     for d in phonetic_to_digit.keys():
@@ -72,8 +132,7 @@ def parse_line(s: str) -> int:
 
 
 def parse_line_part2(s: str) -> int:
-    first = first_phonetic_digit(s)
-    last = last_phonetic_digit(s)
+    first, last = first_and_last_phonetic_digit(s)
     if first is None or last is None:
         return 0
     return first * 10 + last
@@ -85,13 +144,76 @@ def read_file(path: Path) -> Generator[None, str, None]:
             yield line
 
 
+def find_chunk_boundaries(path: Path, num_chunks: int) -> List[Tuple[int, int]]:
+    # split the file in roughly equal byte ranges that end on a newline
+    size = path.stat().st_size
+    if size == 0:
+        return []
+    boundaries = []
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        start = 0
+        for i in range(1, num_chunks + 1):
+            end = mm.find(b"\n", max(start, size * i // num_chunks - 1))
+            end = size if end == -1 else end + 1
+            if end > start:
+                boundaries.append((start, end))
+            start = end
+            if start >= size:
+                break
+    return boundaries
+
+
+def compute_chunk_totals(path: Path, start: int, end: int) -> Tuple[int, int]:
+    total, total_part2 = 0, 0
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        mm.seek(start)
+        while mm.tell() < end:
+            line = mm.readline().decode()
+            total += parse_line(line)
+            total_part2 += parse_line_part2(line)
+    return total, total_part2
+
+
+def compute_totals_parallel(
+    path: Path, num_workers: Optional[int] = None
+) -> Tuple[int, int]:
+    # both parts are computed from the same pass over each chunk
+    num_workers = num_workers or os.cpu_count() or 1
+    boundaries = find_chunk_boundaries(path, num_chunks=4 * num_workers)
+    if len(boundaries) == 0:
+        return 0, 0
+    with ProcessPoolExecutor(max_workers=num_workers) as executor:
+        chunk_totals = list(
+            executor.map(
+                compute_chunk_totals,
+                [path] * len(boundaries),
+                [start for start, _ in boundaries],
+                [end for _, end in boundaries],
+            )
+        )
+    return (
+        sum(total for total, _ in chunk_totals),
+        sum(total_part2 for _, total_part2 in chunk_totals),
+    )
+
+
+def parse(path: Path) -> List[str]:
+    return list(read_file(path))
+
+
+def part1(lines: List[str]) -> int:
+    return sum(parse_line(line) for line in lines)
+
+
+def part2(lines: List[str]) -> int:
+    return sum(parse_line_part2(line) for line in lines)
+
+
 def main():
     # read file
     path = Path(__file__).parent / "input.txt"
-    total = sum(parse_line(line) for line in read_file(path))
+    total, total_part2 = compute_totals_parallel(path)
     print(total)
-
-    total_part2 = sum(parse_line_part2(line) for line in read_file(path))
     print(total_part2)
 
 
@@ -1,5 +1,6 @@
 from pathlib import Path
-from typing import Generator, NamedTuple
+from typing import Generator, Iterable, NamedTuple, Optional, Tuple
+import numpy as np
 
 
 class gameSet(NamedTuple):
@@ -53,19 +54,112 @@ def compute_power(line: str) -> int:
     return maximums[0] * maximums[1] * maximums[2]
 
 
+# reads a game line once into the maximum number of cubes drawn per colour,
+# which is all both parts need.
+def read_game(line: str) -> Optional[Tuple[int, singleSet]]:
+    parts = line.split(":")
+    if len(parts) != 2:
+        return None
+    maximums = {"red": 0, "blue": 0, "green": 0}
+    for cubes in parts[1].replace(";", ",").split(","):
+        count, colour = cubes.split()
+        if int(count) > maximums[colour]:
+            maximums[colour] = int(count)
+    return int(parts[0].split()[1]), singleSet(**maximums)
+
+
+def compute_totals(
+    lines: Iterable[str], game_set: gameSet = gameSet(12, 14, 13)
+) -> Tuple[int, int]:
+    total, total_power = 0, 0
+    for line in lines:
+        game = read_game(line)
+        if game is None:
+            continue
+        id, maximums = game
+        if maximums.is_valid(game_set):
+            total += id
+        total_power += maximums.red * maximums.blue * maximums.green
+    return total, total_power
+
+
+class GameColumns(NamedTuple):
+    ids: np.ndarray
+    max_red: np.ndarray
+    max_blue: np.ndarray
+    max_green: np.ndarray
+
+
+def read_game_columns(lines: Iterable[str]) -> GameColumns:
+    games = [game for game in map(read_game, lines) if game is not None]
+    return GameColumns(
+        ids=np.array([id for id, _ in games], dtype=np.int64),
+        max_red=np.array([m.red for _, m in games], dtype=np.int64),
+        max_blue=np.array([m.blue for _, m in games], dtype=np.int64),
+        max_green=np.array([m.green for _, m in games], dtype=np.int64),
+    )
+
+
+def save_game_columns(columns: GameColumns, path: Path) -> None:
+    with open(path, "wb") as f:
+        np.savez(f, **columns._asdict())
+
+
+def load_game_columns(path: Path) -> GameColumns:
+    with np.load(path) as data:
+        return GameColumns(**{field: data[field] for field in GameColumns._fields})
+
+
+def compute_feasible_id_sums(
+    columns: GameColumns, game_sets: Iterable[gameSet], block_size: int = 2**24
+) -> np.ndarray:
+    # one row per bag limit, evaluated in blocks to bound the
+    # (limits x games) feasibility matrix
+    limits = np.array(list(game_sets), dtype=np.int64).reshape(-1, 3)
+    sums = np.zeros(len(limits), dtype=np.int64)
+    num_limits_per_block = max(1, block_size // max(1, len(columns.ids)))
+    for start in range(0, len(limits), num_limits_per_block):
+        block = limits[start : start + num_limits_per_block]
+        feasible = (
+            (columns.max_red <= block[:, 0, None])
+            & (columns.max_blue <= block[:, 1, None])
+            & (columns.max_green <= block[:, 2, None])
+        )
+        sums[start : start + len(block)] = feasible @ columns.ids
+    return sums
+
+
 def read_file(path: Path) -> Generator[None, str, None]:
     with open(path, "r") as f:
         for line in f:
             yield line
 
 
+def parse(path: Path) -> GameColumns:
+    return read_game_columns(read_file(path))
+
+
+def save_parsed(columns: GameColumns, path: Path) -> None:
+    save_game_columns(columns, path)
+
+
+def load_parsed(path: Path) -> GameColumns:
+    return load_game_columns(path)
+
+
+def part1(columns: GameColumns) -> int:
+    return int(compute_feasible_id_sums(columns, [gameSet(12, 14, 13)])[0])
+
+
+def part2(columns: GameColumns) -> int:
+    return int((columns.max_red * columns.max_blue * columns.max_green).sum())
+
+
 def main():
     # read file
     path = Path(__file__).parent / "input.txt"
-    total = sum(read_line(line) for line in read_file(path))
+    total, total_part2 = compute_totals(read_file(path))
     print(f"part 1: {total}")
-
-    total_part2 = sum(compute_power(line) for line in read_file(path))
     print(f"part 2: {total_part2}")
 
 
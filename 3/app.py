@@ -1,5 +1,5 @@
 from pathlib import Path
-from typing import Generator, NamedTuple, Optional, List, Tuple
+from typing import Dict, Generator, NamedTuple, Optional, List, Tuple
 
 
 class Position(NamedTuple):
@@ -125,6 +125,15 @@ def find_numbers(schematic: List[str]) -> List[MultiDigitNumber]:
     return numbers
 
 
+def build_number_index(numbers: List[MultiDigitNumber]) -> Dict[Position, int]:
+    # maps the position of every digit to the index of its number
+    return {
+        position: number_id
+        for number_id, number in enumerate(numbers)
+        for position in number.positions_of_digits
+    }
+
+
 def find_gears(schematic: List[str]) -> List[Gear]:
     # only single gears
     gears = []
@@ -141,24 +150,28 @@ def find_gears(schematic: List[str]) -> List[Gear]:
 
 
 def find_gear_ratios(
-    gears: List[Gear], numbers: List[MultiDigitNumber], schematic: List[str]
+    gears: List[Gear],
+    numbers: List[MultiDigitNumber],
+    schematic: List[str],
+    number_index: Optional[Dict[Position, int]] = None,
 ) -> List[GearRatio]:
+    if number_index is None:
+        number_index = build_number_index(numbers)
     gear_ratios = []
     for gear in gears:
-        adjacent_numbers = []
-        numbers_to_check = numbers.copy()
+        adjacent_number_ids = []
         for pos_to_check in gear.positions_around_the_gear(schematic):
-            for number in numbers_to_check:
-                if pos_to_check in number.positions_of_digits:
-                    adjacent_numbers.append(number)
-                    numbers_to_check.remove(number)
-                if len(adjacent_numbers) == 2:
-                    break
-            if len(adjacent_numbers) == 2:
+            number_id = number_index.get(pos_to_check)
+            if number_id is not None and number_id not in adjacent_number_ids:
+                adjacent_number_ids.append(number_id)
+            if len(adjacent_number_ids) == 2:
                 break
-        if len(adjacent_numbers) == 2:
+        if len(adjacent_number_ids) == 2:
             gear_ratios.append(
-                GearRatio(gear=gear, ratio_numbers=tuple(adjacent_numbers))
+                GearRatio(
+                    gear=gear,
+                    ratio_numbers=tuple(numbers[i] for i in adjacent_number_ids),
+                )
             )
     return gear_ratios
 
@@ -171,16 +184,121 @@ def read_rows(path: Path) -> List[str]:
     return rows
 
 
+class RowSums(NamedTuple):
+    part_numbers: int
+    gear_ratios: int
+
+
+def find_number_cells(row: str) -> Dict[int, Tuple[int, int, int]]:
+    # maps every digit column to (first column, end column, value) of its
+    # number, the end is exclusive
+    cells = {}
+    column_index = 0
+    while column_index < len(row):
+        if row[column_index].isdigit():
+            end = column_index + 1
+            while end < len(row) and row[end].isdigit():
+                end += 1
+            number = (column_index, end, int(row[column_index:end]))
+            for c in range(column_index, end):
+                cells[c] = number
+            column_index = end
+        else:
+            column_index += 1
+    return cells
+
+
+def compute_row_sums(
+    window: List[Tuple[str, Dict[int, Tuple[int, int, int]]]], middle: int
+) -> RowSums:
+    # window holds the rows above, at and below the row being processed,
+    # middle is the index of that row in the window
+    row, cells = window[middle]
+    neighbour_rows = [r for r, _ in window]
+
+    part_numbers = 0
+    for start, end, value in set(cells.values()):
+        for neighbour_row in neighbour_rows:
+            if any(is_symbol(c) for c in neighbour_row[max(0, start - 1) : end + 1]):
+                part_numbers += value
+                break
+
+    directions = [
+        (-1, 0),
+        (1, 0),
+        (0, -1),
+        (0, 1),
+        (-1, -1),
+        (-1, 1),
+        (1, -1),
+        (1, 1),
+    ]
+    gear_ratios = 0
+    for column_index, char in enumerate(row):
+        if char != "*":
+            continue
+        adjacent_numbers = []
+        for dr, dc in directions:
+            if not 0 <= middle + dr < len(window):
+                continue
+            number = window[middle + dr][1].get(column_index + dc)
+            if number is not None and (dr, number) not in adjacent_numbers:
+                adjacent_numbers.append((dr, number))
+            if len(adjacent_numbers) == 2:
+                break
+        if len(adjacent_numbers) == 2:
+            gear_ratios += adjacent_numbers[0][1][2] * adjacent_numbers[1][1][2]
+    return RowSums(part_numbers=part_numbers, gear_ratios=gear_ratios)
+
+
+def stream_row_sums(path: Path) -> Generator[RowSums, None, None]:
+    # only three rows are kept in memory at any time
+    window = []
+    with open(path, "r") as f:
+        for line in f:
+            row = line.strip()
+            window.append((row, find_number_cells(row)))
+            if len(window) == 3:
+                yield compute_row_sums(window, middle=1)
+                window.pop(0)
+            elif len(window) == 2:
+                yield compute_row_sums(window, middle=0)
+    if len(window) == 2:
+        yield compute_row_sums(window, middle=1)
+    elif len(window) == 1:
+        yield compute_row_sums(window, middle=0)
+
+
+def parse(path: Path) -> Tuple[List[str], List[MultiDigitNumber], Dict[Position, int]]:
+    schematic = read_rows(path)
+    numbers = find_numbers(schematic)
+    return schematic, numbers, build_number_index(numbers)
+
+
+def part1(parsed: Tuple[List[str], List[MultiDigitNumber], Dict[Position, int]]) -> int:
+    schematic, numbers, _ = parsed
+    good_numbers = keep_numbers_with_at_least_one_symbol_around(numbers, schematic)
+    return sum(number.value for number in good_numbers)
+
+
+def part2(parsed: Tuple[List[str], List[MultiDigitNumber], Dict[Position, int]]) -> int:
+    schematic, numbers, number_index = parsed
+    gears = find_gears(schematic)
+    gear_ratios = find_gear_ratios(gears, numbers, schematic, number_index)
+    return sum(gear_ratio.compute() for gear_ratio in gear_ratios)
+
+
 def main():
     # read file
     path = Path(__file__).parent / "input.txt"
     schematic = read_rows(path)
     numbers = find_numbers(schematic)
+    number_index = build_number_index(numbers)
     good_numbers = keep_numbers_with_at_least_one_symbol_around(numbers, schematic)
     print(f"part 1: {sum(number.value for number in good_numbers)}")
 
     gears = find_gears(schematic)
-    gear_ratios = find_gear_ratios(gears, numbers, schematic)
+    gear_ratios = find_gear_ratios(gears, numbers, schematic, number_index)
     print(f"part 2: {sum(gear_ratio.compute() for gear_ratio in gear_ratios)}")
 
 
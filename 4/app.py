@@ -1,7 +1,9 @@
-from typing import Any, Dict, List
+from typing import Any, Dict, Generator, Iterable, List, NamedTuple, Tuple
 from pathlib import Path
 
+from collections import deque
 from math import floor
+import numpy as np
 
 
 def compute_win_tree(id_to_num_copies_won: Dict[int, int]) -> Dict[int, Any]:
@@ -23,6 +25,51 @@ def compute_num_card_visits(win_tree: Dict[int, Any]) -> Dict[int, int]:
     return visit_count
 
 
+def compute_num_card_copies(id_to_num_copies_won: Dict[int, int]) -> Dict[int, int]:
+    # prefix differences: a card with k wins adds its copy count to the
+    # next k cards, recorded as +count at id + 1 and -count at id + 1 + k
+    copy_count = {}
+    count_diff: Dict[int, int] = {}
+    won_copies = 0
+    if len(id_to_num_copies_won) == 0:
+        return copy_count
+    for id in range(min(id_to_num_copies_won), max(id_to_num_copies_won) + 1):
+        won_copies += count_diff.pop(id, 0)
+        if id not in id_to_num_copies_won:
+            continue
+        copy_count[id] = 1 + won_copies
+        num_copies_won = id_to_num_copies_won[id]
+        if num_copies_won > 0:
+            count_diff[id + 1] = count_diff.get(id + 1, 0) + copy_count[id]
+            end = id + 1 + num_copies_won
+            count_diff[end] = count_diff.get(end, 0) - copy_count[id]
+    return copy_count
+
+
+def count_card_matches(line: str) -> int:
+    winning_numbers, chosen_numbers = line.split(":")[1].split("|")
+    return len(set(winning_numbers.split()).intersection(chosen_numbers.split()))
+
+
+def stream_card_copies(lines: Iterable[str]) -> Generator[int, None, None]:
+    # yields the running total of cards after each card. A card only adds
+    # copies to the next few cards, so the copies still owed to upcoming
+    # cards fit in a ring buffer as deep as the largest win count.
+    pending: deque = deque()
+    total = 0
+    for line in lines:
+        if line.strip() == "":
+            continue
+        copies = 1 + (pending.popleft() if pending else 0)
+        total += copies
+        num_copies_won = count_card_matches(line)
+        while len(pending) < num_copies_won:
+            pending.append(0)
+        for i in range(num_copies_won):
+            pending[i] += copies
+        yield total
+
+
 def compute_number_overlapping_numbers(
     winning_numbers: List[int], chosen_numbers: List[int]
 ) -> int:
@@ -44,31 +91,123 @@ def read_rows(path: Path) -> Dict[int, Any]:
             winning_numbers, chosen_numbers = numbers.split("|")
             winning_numbers = [int(n) for n in winning_numbers.split(" ") if n != ""]
             chosen_numbers = [int(n) for n in chosen_numbers.split(" ") if n != ""]
-            rows[int(id[-3:])] = {
+            rows[int(id.split()[1])] = {
                 "winning_numbers": winning_numbers,
                 "chosen_numbers": chosen_numbers,
             }
     return rows
 
 
+class CardColumns(NamedTuple):
+    # one row per card, every card has the same amount of numbers
+    ids: np.ndarray
+    winning_numbers: np.ndarray
+    chosen_numbers: np.ndarray
+
+
+def read_card_columns(path: Path) -> CardColumns:
+    text = path.read_text()
+    num_rows = len(text.strip().splitlines())
+    if num_rows == 0:
+        empty = np.zeros((0, 0), dtype=np.int64)
+        return CardColumns(np.zeros(0, dtype=np.int64), empty, empty)
+    first_line = text.lstrip().split("\n", 1)[0]
+    num_winning = len(first_line.split(":")[1].split("|")[0].split())
+    # only numbers are left, the id followed by the winning and chosen ones
+    text = text.replace("Card", " ").replace(":", " ").replace("|", " ")
+    values = np.fromstring(text, dtype=np.int64, sep=" ")
+    values = values.reshape(num_rows, -1)
+    return CardColumns(
+        ids=values[:, 0],
+        winning_numbers=values[:, 1 : 1 + num_winning],
+        chosen_numbers=values[:, 1 + num_winning :],
+    )
+
+
+def compute_match_counts(
+    cards: CardColumns, max_block_bytes: int = 2**22
+) -> np.ndarray:
+    # number of distinct chosen numbers that are winning, per card. Cards
+    # are processed in blocks whose temporary arrays stay within
+    # max_block_bytes, with whichever method needs less memory per card.
+    match_counts = np.zeros(len(cards.ids), dtype=np.int64)
+    if len(cards.ids) == 0:
+        return match_counts
+    numbers = (cards.winning_numbers, cards.chosen_numbers)
+    min_number = int(min(n.min() for n in numbers))
+    number_range = int(max(n.max() for n in numbers)) - min_number + 1
+    num_pairs = cards.winning_numbers.shape[1] * cards.chosen_numbers.shape[1]
+    use_number_range = 2 * number_range <= num_pairs
+    bytes_per_card = 2 * number_range if use_number_range else num_pairs
+    block_size = max(1, max_block_bytes // bytes_per_card)
+    for start in range(0, len(cards.ids), block_size):
+        winning = cards.winning_numbers[start : start + block_size]
+        chosen = cards.chosen_numbers[start : start + block_size]
+        if use_number_range:
+            # boolean rows over the number range mark the winning and the
+            # chosen numbers of every card
+            rows = np.arange(len(winning))[:, None]
+            is_winning = np.zeros((len(winning), number_range), dtype=bool)
+            is_winning[rows, winning - min_number] = True
+            is_chosen = np.zeros((len(winning), number_range), dtype=bool)
+            is_chosen[rows, chosen - min_number] = True
+            counts = np.count_nonzero(is_winning & is_chosen, axis=1)
+        else:
+            # every chosen number against every winning one, repeated chosen
+            # numbers are only counted once
+            chosen = np.sort(chosen, axis=1)
+            is_first = np.ones(chosen.shape, dtype=bool)
+            is_first[:, 1:] = chosen[:, 1:] != chosen[:, :-1]
+            is_winning = (winning[:, :, None] == chosen[:, None, :]).any(axis=1)
+            counts = np.count_nonzero(is_winning & is_first, axis=1)
+        match_counts[start : start + len(winning)] = counts
+    return match_counts
+
+
+def compute_total_points(match_counts: np.ndarray) -> int:
+    # 2 ** (matches - 1), and 0 for cards without matches. Python ints take
+    # over once the points may not fit in int64.
+    if len(match_counts) > 0 and match_counts.max() >= 62:
+        match_counts = match_counts.astype(object)
+    return int(((1 << match_counts) >> 1).sum())
+
+
+def parse(path: Path) -> Tuple[np.ndarray, np.ndarray]:
+    cards = read_card_columns(path)
+    return cards.ids, compute_match_counts(cards)
+
+
+def save_parsed(parsed: Tuple[np.ndarray, np.ndarray], path: Path) -> None:
+    ids, match_counts = parsed
+    with open(path, "wb") as f:
+        np.savez(f, ids=ids, match_counts=match_counts)
+
+
+def load_parsed(path: Path) -> Tuple[np.ndarray, np.ndarray]:
+    with np.load(path) as data:
+        return data["ids"], data["match_counts"]
+
+
+def part1(parsed: Tuple[np.ndarray, np.ndarray]) -> int:
+    _, match_counts = parsed
+    return compute_total_points(match_counts)
+
+
+def part2(parsed: Tuple[np.ndarray, np.ndarray]) -> int:
+    ids, match_counts = parsed
+    id_to_num_copies_won = dict(zip(ids.tolist(), match_counts.tolist()))
+    return sum(compute_num_card_copies(id_to_num_copies_won).values())
+
+
 def main():
     # read file
     path = Path(__file__).parent / "input.txt"
-    rows = read_rows(path)
-    total = sum(
-        compute_points(row["winning_numbers"], row["chosen_numbers"])
-        for row in rows.values()
-    )
-    print(total)
+    ids, match_counts = parse(path)
+    print(compute_total_points(match_counts))
 
-    number_overlapping_numbers = {
-        key: compute_number_overlapping_numbers(
-            row["winning_numbers"], row["chosen_numbers"]
-        )
-        for key, row in rows.items()
-    }
-    win_tree = compute_win_tree(number_overlapping_numbers)
-    num_card_visits = compute_num_card_visits(win_tree)
+    num_card_visits = compute_num_card_copies(
+        dict(zip(ids.tolist(), match_counts.tolist()))
+    )
     total_part2 = sum(num_card_visits.values())
     print(total_part2)
 
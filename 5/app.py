@@ -1,6 +1,23 @@
-from typing import Any, Callable, Dict, Generator, Iterable, List, NamedTuple
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generator,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
 from pathlib import Path
-from functools import partial
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor, wait
+from heapq import heappop, heappush
+from multiprocessing import Manager
+from queue import Empty
+import os
+import numpy as np
 from tqdm import tqdm
 
 
@@ -18,18 +35,395 @@ class AlemenacMapping(NamedTuple):
         return id
 
 
+class IdRange(NamedTuple):
+    start: int
+    end: int  # exclusive
+
+    def is_empty(self) -> bool:
+        return self.start >= self.end
+
+
+class CompiledMapping(NamedTuple):
+    # offsets[i] applies to ids in [starts[i], starts[i + 1]),
+    # ids below starts[0] are not mapped
+    starts: Tuple[int, ...]
+    offsets: Tuple[int, ...]
+
+    def map(self, id: int) -> int:
+        index = bisect_right(self.starts, id) - 1
+        if index < 0:
+            return id
+        return id + self.offsets[index]
+
+    def map_array(self, ids: np.ndarray) -> np.ndarray:
+        starts = np.array(self.starts, dtype=np.int64)
+        offsets = np.array((0,) + self.offsets, dtype=np.int64)
+        return ids + offsets[np.searchsorted(starts, ids, side="right")]
+
+    def split_range(self, id_range: IdRange) -> List[Tuple[IdRange, int]]:
+        # the pieces of id_range between the boundaries it crosses, each with
+        # the offset applied to it
+        pieces = []
+        start = id_range.start
+        index = bisect_right(self.starts, start) - 1
+        while start < id_range.end:
+            end = id_range.end
+            if index + 1 < len(self.starts):
+                end = min(end, self.starts[index + 1])
+            offset = self.offsets[index] if index >= 0 else 0
+            pieces.append((IdRange(start, end), offset))
+            start = end
+            index += 1
+        return pieces
+
+    def map_ranges(self, id_ranges: List[IdRange]) -> List[IdRange]:
+        return [
+            IdRange(piece.start + offset, piece.end + offset)
+            for id_range in id_ranges
+            for piece, offset in self.split_range(id_range)
+        ]
+
+    def invert(self) -> "InverseMapping":
+        # the destination range of every piece, ids below starts[0] and from
+        # starts[-1] on map onto themselves
+        pieces = []
+        if not self.starts:
+            pieces.append((0, None, 0))
+        elif self.starts[0] > 0:
+            pieces.append((0, self.starts[0], 0))
+        for i, (start, offset) in enumerate(zip(self.starts, self.offsets)):
+            end = self.starts[i + 1] + offset if i + 1 < len(self.starts) else None
+            pieces.append((start + offset, end, offset))
+        pieces.sort(key=lambda p: p[0])
+
+        # pieces may overlap, sweep their boundaries keeping the active ones
+        boundaries = sorted(
+            {start for start, _, _ in pieces}
+            | {end for _, end, _ in pieces if end is not None}
+        )
+        active = []
+        next_piece = 0
+        starts, offsets = [], []
+        for boundary in boundaries:
+            while next_piece < len(pieces) and pieces[next_piece][0] <= boundary:
+                active.append(pieces[next_piece])
+                next_piece += 1
+            active = [p for p in active if p[1] is None or p[1] > boundary]
+            sources = tuple(sorted(offset for _, _, offset in active))
+            if offsets and offsets[-1] == sources:
+                continue
+            starts.append(boundary)
+            offsets.append(sources)
+        return InverseMapping(tuple(starts), tuple(offsets))
+
+
+class InverseMapping(NamedTuple):
+    # offsets[i] holds every offset that maps a source id onto the ids in
+    # [starts[i], starts[i + 1]), ids below starts[0] have no source
+    starts: Tuple[int, ...]
+    offsets: Tuple[Tuple[int, ...], ...]
+
+    def preimages(self, id: int) -> List[int]:
+        index = bisect_right(self.starts, id) - 1
+        if index < 0:
+            return []
+        return [id - offset for offset in self.offsets[index]]
+
+
+def compile_mapping_section(
+    mapping_ranges: List[AlemenacMapping],
+) -> CompiledMapping:
+    # sweep over the boundaries, keeping the ranges that cover the current
+    # one in a heap ordered by position, so the first matching range wins
+    # like it did in the linear scan
+    boundaries = sorted(
+        {m.source_categ for m in mapping_ranges}
+        | {m.source_categ + m.range for m in mapping_ranges}
+    )
+    by_source = sorted(enumerate(mapping_ranges), key=lambda r: r[1].source_categ)
+    active = []
+    next_range = 0
+    starts, offsets = [], []
+    for start in boundaries:
+        while (
+            next_range < len(by_source)
+            and by_source[next_range][1].source_categ <= start
+        ):
+            heappush(active, by_source[next_range])
+            next_range += 1
+        while active and not active[0][1].is_in_source_range(start):
+            heappop(active)
+        offset = 0
+        if active:
+            single_range = active[0][1]
+            offset = single_range.destination_categ - single_range.source_categ
+        if offsets and offsets[-1] == offset:
+            continue
+        starts.append(start)
+        offsets.append(offset)
+    return CompiledMapping(tuple(starts), tuple(offsets))
+
+
+def compile_chain_of_mappings(
+    chain_of_mappings: List[List[AlemenacMapping]],
+) -> List[CompiledMapping]:
+    return [compile_mapping_section(m) for m in chain_of_mappings]
+
+
+def map_seed_ids(
+    seed_ids: np.ndarray, compiled_chain: List[CompiledMapping]
+) -> np.ndarray:
+    ids = np.asarray(seed_ids, dtype=np.int64)
+    for compiled in compiled_chain:
+        ids = compiled.map_array(ids)
+    return ids
+
+
+def map_id_ranges(
+    id_ranges: List[IdRange], mapping_ranges: List[AlemenacMapping]
+) -> List[IdRange]:
+    return compile_mapping_section(mapping_ranges).map_ranges(id_ranges)
+
+
+def merge_id_ranges(id_ranges: List[IdRange]) -> List[IdRange]:
+    merged = []
+    for id_range in sorted(id_ranges):
+        if merged and id_range.start <= merged[-1].end:
+            merged[-1] = IdRange(merged[-1].start, max(merged[-1].end, id_range.end))
+        else:
+            merged.append(id_range)
+    return merged
+
+
+def compute_seed_id_ranges(raw_seed_pairs: List[int]) -> List[IdRange]:
+    return [
+        IdRange(start, start + seed_range)
+        for start, seed_range in zip(raw_seed_pairs[::2], raw_seed_pairs[1::2])
+        if seed_range > 0
+    ]
+
+
+def compute_min_location_of_seed_ranges(
+    seed_ranges: List[IdRange], chain_of_mappings: List[List[AlemenacMapping]]
+) -> Optional[int]:
+    # merging after every layer keeps the number of pieces from compounding,
+    # None when there are no seeds
+    id_ranges = merge_id_ranges(seed_ranges)
+    for compiled in compile_chain_of_mappings(chain_of_mappings):
+        id_ranges = merge_id_ranges(compiled.map_ranges(id_ranges))
+    return min((id_range.start for id_range in id_ranges), default=None)
+
+
 def compute_min_location_of_seeds(
-    seeds: Iterable[int], chain_of_mappings: List[List[AlemenacMapping]]
-) -> int:
+    seeds: Iterable[int],
+    chain_of_mappings: List[List[AlemenacMapping]],
+    show_progress: bool = True,
+) -> Optional[int]:
+    # None when there are no seeds
     mapping_functions = construct_mapping_functions(chain_of_mappings)
-    min_location = 9999999999999
-    for seed in tqdm(seeds):
+    min_location = None
+    for seed in tqdm(seeds) if show_progress else seeds:
         for f in mapping_functions:
             seed = f(seed)
-        min_location = min(min_location, seed)
+        if min_location is None or seed < min_location:
+            min_location = seed
     return min_location
 
 
+def compose_mapping_pieces(
+    seed_ranges: List[IdRange], compiled_chain: List[CompiledMapping]
+) -> List[Tuple[IdRange, int]]:
+    # breakpoints of the whole chain: seed pieces on which every layer
+    # applies a single offset, with the summed offset to the location.
+    # Neighbouring pieces with the same offset are merged after every layer.
+    pieces = [(seed_range, 0) for seed_range in merge_id_ranges(seed_ranges)]
+    for compiled in compiled_chain:
+        split_pieces = []
+        for seed_piece, offset in pieces:
+            for piece, extra in compiled.split_range(
+                IdRange(seed_piece.start + offset, seed_piece.end + offset)
+            ):
+                piece = IdRange(piece.start - offset, piece.end - offset)
+                if (
+                    split_pieces
+                    and split_pieces[-1][0].end == piece.start
+                    and split_pieces[-1][1] == offset + extra
+                ):
+                    piece = IdRange(split_pieces.pop()[0].start, piece.end)
+                split_pieces.append((piece, offset + extra))
+        pieces = split_pieces
+    return pieces
+
+
+def compute_min_location_by_inverse_breakpoints(
+    seed_ranges: List[IdRange], chain_of_mappings: List[List[AlemenacMapping]]
+) -> Optional[int]:
+    # the breakpoints of the composed chain over every id between the first
+    # and the last seed, visited in ascending location order. A piece only
+    # counts through the first seed it holds, so the search stops once a
+    # piece starts at or above the best location found.
+    seed_ranges = merge_id_ranges(seed_ranges)
+    if not seed_ranges:
+        return None
+    seed_starts = [r.start for r in seed_ranges]
+    pieces = compose_mapping_pieces(
+        [IdRange(seed_ranges[0].start, seed_ranges[-1].end)],
+        compile_chain_of_mappings(chain_of_mappings),
+    )
+    pieces.sort(key=lambda p: p[0].start + p[1])
+    min_location = None
+    for piece, offset in pieces:
+        if min_location is not None and piece.start + offset >= min_location:
+            break
+        index = bisect_right(seed_starts, piece.start) - 1
+        if index >= 0 and piece.start < seed_ranges[index].end:
+            first_seed = piece.start
+        elif index + 1 < len(seed_ranges) and seed_starts[index + 1] < piece.end:
+            first_seed = seed_starts[index + 1]
+        else:
+            continue
+        if min_location is None or first_seed + offset < min_location:
+            min_location = first_seed + offset
+    return min_location
+
+
+def compute_min_location_by_reverse_scan(
+    seed_ranges: List[IdRange],
+    chain_of_mappings: List[List[AlemenacMapping]],
+    max_location: Optional[int] = None,
+) -> Optional[int]:
+    # walks locations upwards through the inverted chain, fast when the
+    # answer is a small location
+    inverted_chain = [
+        compiled.invert() for compiled in compile_chain_of_mappings(chain_of_mappings)
+    ][::-1]
+    seed_ranges = merge_id_ranges(seed_ranges)
+    if not seed_ranges:
+        return None
+    seed_starts = [r.start for r in seed_ranges]
+    location = 0
+    while max_location is None or location <= max_location:
+        ids = {location}
+        for compiled in inverted_chain:
+            ids = {source for id in ids for source in compiled.preimages(id)}
+        for id in ids:
+            index = bisect_right(seed_starts, id) - 1
+            if index >= 0 and id < seed_ranges[index].end:
+                return location
+        location += 1
+    return None
+
+
+def compute_min_location(
+    raw_seed_pairs: List[int],
+    chain_of_mappings: List[List[AlemenacMapping]],
+    strategy: str = "ranges",
+) -> Optional[int]:
+    # None when there are no seeds, whatever the strategy
+    strategies = {
+        "ranges": compute_min_location_of_seed_ranges,
+        "inverse_breakpoints": compute_min_location_by_inverse_breakpoints,
+        "reverse_scan": compute_min_location_by_reverse_scan,
+        "seeds": lambda seed_ranges, mappings: compute_min_location_of_seeds(
+            (id for r in seed_ranges for id in range(r.start, r.end)), mappings
+        ),
+    }
+    if strategy not in strategies:
+        raise ValueError(f"Unknown strategy {strategy}, use one of {list(strategies)}")
+    seed_ranges = compute_seed_id_ranges(raw_seed_pairs)
+    if not seed_ranges:
+        return None
+    return strategies[strategy](seed_ranges, chain_of_mappings)
+
+
+def split_seed_pairs(raw_seed_pairs: List[int], num_shards: int) -> List[List[IdRange]]:
+    # shards hold (about) the same number of seeds, a shard may take the end
+    # of one seed range and the start of the next
+    seed_ranges = compute_seed_id_ranges(raw_seed_pairs)
+    total = sum(r.end - r.start for r in seed_ranges)
+    shard_size = max(1, -(-total // num_shards))
+    shards = [[]]
+    room = shard_size
+    for seed_range in seed_ranges:
+        start = seed_range.start
+        while start < seed_range.end:
+            if room == 0:
+                shards.append([])
+                room = shard_size
+            end = min(seed_range.end, start + room)
+            shards[-1].append(IdRange(start, end))
+            room -= end - start
+            start = end
+    return [shard for shard in shards if shard]
+
+
+def iterate_shard_seeds(
+    shard: List[IdRange], progress: Any = None, batch_size: int = 100_000
+) -> Iterator[int]:
+    # reports the number of seeds done to progress once per batch
+    done = 0
+    for id_range in shard:
+        for seed in range(id_range.start, id_range.end):
+            yield seed
+            done += 1
+            if done == batch_size:
+                if progress is not None:
+                    progress.put(done)
+                done = 0
+    if progress is not None and done > 0:
+        progress.put(done)
+
+
+def compute_min_location_of_shard(
+    shard: List[IdRange],
+    chain_of_mappings: List[List[AlemenacMapping]],
+    progress: Any = None,
+    batch_size: int = 100_000,
+) -> Optional[int]:
+    return compute_min_location_of_seeds(
+        iterate_shard_seeds(shard, progress, batch_size),
+        chain_of_mappings,
+        show_progress=False,
+    )
+
+
+def compute_min_location_of_seeds_sharded(
+    raw_seed_pairs: List[int],
+    chain_of_mappings: List[List[AlemenacMapping]],
+    num_workers: Optional[int] = None,
+    batch_size: int = 100_000,
+) -> Optional[int]:
+    # exhaustive per seed, for verifying compute_min_location_of_seed_ranges
+    num_workers = num_workers or os.cpu_count() or 1
+    shards = split_seed_pairs(raw_seed_pairs, num_workers)
+    total = sum(r.end - r.start for shard in shards for r in shard)
+    with Manager() as manager, ProcessPoolExecutor(num_workers) as executor:
+        progress = manager.Queue()
+        futures = [
+            executor.submit(
+                compute_min_location_of_shard,
+                shard,
+                chain_of_mappings,
+                progress,
+                batch_size,
+            )
+            for shard in shards
+        ]
+        with tqdm(total=total) as bar:
+            while not all(future.done() for future in futures):
+                try:
+                    bar.update(progress.get(timeout=0.1))
+                except Empty:
+                    pass
+            while not progress.empty():
+                bar.update(progress.get())
+        wait(futures)
+        return min(
+            (future.result() for future in futures if future.result() is not None),
+            default=None,
+        )
+
+
 def read_seeds(section_data):
     return [int(s) for s in section_data.split()]
 
@@ -47,16 +441,7 @@ def read_mapping_section(section_data: str) -> List[AlemenacMapping]:
 def construct_mapping_functions(
     chain_of_mappings: List[List[AlemenacMapping]],
 ) -> List[Callable]:
-    def mapping_f(id: int, mapping_ranges: List[AlemenacMapping]):
-        for single_range in mapping_ranges:
-            if single_range.is_in_source_range(id):
-                return single_range.map(id)
-        return id
-
-    return [
-        partial(mapping_f, mapping_ranges=mapping_ranges)
-        for mapping_ranges in chain_of_mappings
-    ]
+    return [compiled.map for compiled in compile_chain_of_mappings(chain_of_mappings)]
 
 
 def compute_seed_ids(raw_seed_pairs: List[int]) -> Generator[None, None, int]:
@@ -90,16 +475,30 @@ def read_rows(path: Path):
     return chain_of_mappings[0], chain_of_mappings[1:]
 
 
+def parse(path: Path) -> Tuple[List[int], List[List[AlemenacMapping]]]:
+    return read_rows(path)
+
+
+def part1(parsed: Tuple[List[int], List[List[AlemenacMapping]]]) -> int:
+    seeds, mappings = parsed
+    return int(map_seed_ids(seeds, compile_chain_of_mappings(mappings)).min())
+
+
+def part2(parsed: Tuple[List[int], List[List[AlemenacMapping]]]) -> Optional[int]:
+    seeds, mappings = parsed
+    return compute_min_location_of_seed_ranges(compute_seed_id_ranges(seeds), mappings)
+
+
 def main():
     # read file
     path = Path(__file__).parent / "input.txt"
     seeds, mappings = read_rows(path)
     print(seeds)
-    min_location = compute_min_location_of_seeds(seeds, mappings)
+    min_location = int(map_seed_ids(seeds, compile_chain_of_mappings(mappings)).min())
     print(f"min of locations: {min_location}")
 
     print(
-        f"min of seed ranges: {compute_min_location_of_seeds(compute_seed_ids(seeds), mappings)}"
+        f"min of seed ranges: {compute_min_location_of_seed_ranges(compute_seed_id_ranges(seeds), mappings)}"
     )
 
 
@@ -1,6 +1,6 @@
 from pathlib import Path
 from typing import List, Tuple
-from math import ceil, floor
+from math import ceil, floor, isqrt
 
 
 def read_input(path: Path) -> List[Tuple[int, int]]:
@@ -29,10 +29,54 @@ def compute_number_of_ways_to_win(records: List[Tuple[int, int]]) -> int:
     return all_ways_to_win
 
 
+def compute_number_of_ways_to_win_race(time: int, distance: int) -> int:
+    # holding h wins when h * (time - h) > distance, the winning holds are
+    # symmetric around time / 2, so only the smallest one is needed
+    delta = time**2 - 4 * distance
+    if delta <= 0:
+        return 0
+    hold = (time - isqrt(delta)) // 2
+    # isqrt rounds down, the smallest winning hold is at most a step away
+    while hold > 0 and (hold - 1) * (time - hold + 1) > distance:
+        hold -= 1
+    while hold * (time - hold) <= distance:
+        hold += 1
+        if 2 * hold > time:
+            return 0
+    return time - 2 * hold + 1
+
+
+def compute_number_of_ways_to_win_exact(records: List[Tuple[int, int]]) -> List[int]:
+    return [
+        compute_number_of_ways_to_win_race(time, distance) for time, distance in records
+    ]
+
+
+def parse(path: Path) -> List[Tuple[int, int]]:
+    return read_input(path)
+
+
+def part1(records: List[Tuple[int, int]]) -> int:
+    p = 1
+    for way in compute_number_of_ways_to_win_exact(records):
+        p *= way
+    return p
+
+
+def part2(records: List[Tuple[int, int]]) -> int:
+    # the single long race is every column read without the spaces, joined
+    # arithmetically since int() refuses strings of thousands of digits
+    time, distance = 0, 0
+    for t, d in records:
+        time = time * 10 ** len(str(t)) + t
+        distance = distance * 10 ** len(str(d)) + d
+    return compute_number_of_ways_to_win_race(time, distance)
+
+
 def main():
     path = Path(__file__).parent / "input.txt"
     race_records = read_input(path)
-    num_ways_to_win = compute_number_of_ways_to_win(race_records)
+    num_ways_to_win = compute_number_of_ways_to_win_exact(race_records)
     p = 1
     for way in num_ways_to_win:
         p *= way
@@ -40,7 +84,7 @@ def main():
 
     path2 = Path(__file__).parent / "input2.txt"
     race_records2 = read_input(path2)
-    print(compute_number_of_ways_to_win(race_records2))
+    print(compute_number_of_ways_to_win_exact(race_records2))
 
 
 if __name__ == "__main__":
@@ -2,8 +2,9 @@ from pathlib import Path
 from typing import Dict, List, Tuple, NamedTuple, Callable
 from enum import Enum
 import functools
+import itertools
 from math import ceil, floor
-
+import numpy as np
 
 card_ordering = "23456789TJQKA"
 card_ordering_joker = "J23456789TJQKA"
@@ -102,6 +103,35 @@ def compare_same_type_hands(
             return -1
 
 
+card_to_index = {card: i for i, card in enumerate(card_ordering)}
+card_to_rank = {card: card_ordering.index(card) for card in card_ordering}
+card_to_rank_joker = {card: card_ordering_joker.index(card) for card in card_ordering}
+# joker ordering has 14 slots, so ranks are packed in base 14
+rank_base = len(card_ordering_joker)
+
+
+@functools.lru_cache(maxsize=None)
+def build_hand_type_table(jokerify: bool = False) -> Tuple[int, ...]:
+    # type strength (0 = HighCard) of every possible hand, indexed by
+    # the base-13 encoding of its cards in card_ordering
+    num_hands = len(card_ordering) ** 5
+    hands = np.stack(
+        np.unravel_index(np.arange(num_hands), (len(card_ordering),) * 5), axis=1
+    )
+    return tuple(compute_hand_strengths_array(hands, jokerify=jokerify).tolist())
+
+
+def compute_hand_key(hand: str, jokerify: bool = False) -> int:
+    type_table = build_hand_type_table(jokerify)
+    to_rank = card_to_rank_joker if jokerify else card_to_rank
+    index = 0
+    ranks = 0
+    for card in hand:
+        index = index * len(card_ordering) + card_to_index[card]
+        ranks = ranks * rank_base + to_rank[card]
+    return type_table[index] * rank_base ** len(hand) + ranks
+
+
 def read_input(path: Path):
     hands_and_bids = path.read_text().split()
     return list(zip(hands_and_bids[::2], [int(i) for i in hands_and_bids[1::2]]))
@@ -110,10 +140,7 @@ def read_input(path: Path):
 def compute_ranking(
     hands_and_bids: List[Tuple[str, int]], jokerify: bool = False
 ) -> List[int]:
-    cmp_f = (
-        functools.partial(compare_hands, jokerify=True) if jokerify else compare_hands
-    )
-    hands_and_bids.sort(key=functools.cmp_to_key(cmp_f), reverse=True)
+    hands_and_bids.sort(key=lambda item: compute_hand_key(item[0], jokerify=jokerify))
     return hands_and_bids
 
 
@@ -126,6 +153,101 @@ def compute_winnings(
     return winnings
 
 
+def read_input_array(path: Path) -> Tuple[np.ndarray, np.ndarray]:
+    # hands as an n x 5 array of indices into card_ordering, bids as int64
+    data = path.read_bytes().replace(b"\r", b"").strip() + b"\n"
+    chars = np.frombuffer(data, dtype=np.uint8)
+    line_ends = np.flatnonzero(chars == ord("\n"))
+    line_starts = np.concatenate(([0], line_ends[:-1] + 1))
+
+    byte_to_index = np.zeros(256, dtype=np.uint8)
+    for card, i in card_to_index.items():
+        byte_to_index[ord(card)] = i
+    hands = byte_to_index[chars[line_starts[:, None] + np.arange(5)]]
+
+    # bids are right aligned against the newline, digits left of the
+    # space after the hand are masked out
+    bid_starts = line_starts + 6
+    width = int((line_ends - bid_starts).max())
+    positions = line_ends[:, None] - width + np.arange(width)
+    digits = chars[positions.clip(0)].astype(np.int64) - ord("0")
+    digits[positions < bid_starts[:, None]] = 0
+    bids = digits @ (10 ** np.arange(width - 1, -1, -1, dtype=np.int64))
+    return hands, bids
+
+
+# type of a hand from (number of jokers, number of equal pairs among the
+# other cards), jokers always join the biggest group of the other cards
+jokers_and_pairs_to_type = {
+    (0, 10): Type.FiveOfAKind,
+    (0, 6): Type.FourOfAKind,
+    (0, 4): Type.FullHouse,
+    (0, 3): Type.ThreeOfAKind,
+    (0, 2): Type.TwoPair,
+    (0, 1): Type.OnePair,
+    (0, 0): Type.HighCard,
+    (1, 6): Type.FiveOfAKind,
+    (1, 3): Type.FourOfAKind,
+    (1, 2): Type.FullHouse,
+    (1, 1): Type.ThreeOfAKind,
+    (1, 0): Type.OnePair,
+    (2, 3): Type.FiveOfAKind,
+    (2, 1): Type.FourOfAKind,
+    (2, 0): Type.ThreeOfAKind,
+    (3, 1): Type.FiveOfAKind,
+    (3, 0): Type.FourOfAKind,
+    (4, 0): Type.FiveOfAKind,
+    (5, 0): Type.FiveOfAKind,
+}
+
+
+def compute_hand_strengths_array(
+    hands: np.ndarray, jokerify: bool = False
+) -> np.ndarray:
+    # counting equal pairs identifies the type without sorting card counts
+    is_joker = np.zeros(hands.shape, dtype=bool)
+    if jokerify:
+        is_joker = hands == card_to_index["J"]
+    pairs = np.zeros(len(hands), dtype=np.int64)
+    for i, j in itertools.combinations(range(hands.shape[1]), 2):
+        pairs += (hands[:, i] == hands[:, j]) & ~is_joker[:, i]
+    jokers = is_joker.sum(axis=1)
+
+    strength_table = np.zeros((6, 11), dtype=np.int64)
+    for (num_jokers, num_pairs), hand_type in jokers_and_pairs_to_type.items():
+        strength_table[num_jokers, num_pairs] = len(Type) - hand_type.value
+    return strength_table[jokers, pairs]
+
+
+def compute_hand_keys_array(hands: np.ndarray, jokerify: bool = False) -> np.ndarray:
+    to_rank = card_to_rank_joker if jokerify else card_to_rank
+    index_to_rank = np.array([to_rank[card] for card in card_ordering], dtype=np.int64)
+    ranks = index_to_rank[hands] @ (
+        rank_base ** np.arange(hands.shape[1] - 1, -1, -1, dtype=np.int64)
+    )
+    strengths = compute_hand_strengths_array(hands, jokerify=jokerify)
+    return strengths.astype(np.int64) * rank_base ** hands.shape[1] + ranks
+
+
+def compute_winnings_array(
+    hands: np.ndarray, bids: np.ndarray, jokerify: bool = False
+) -> int:
+    order = np.argsort(compute_hand_keys_array(hands, jokerify=jokerify), kind="stable")
+    return int(bids[order] @ np.arange(1, len(bids) + 1, dtype=np.int64))
+
+
+def parse(path: Path) -> List[Tuple[str, int]]:
+    return read_input(path)
+
+
+def part1(hands_and_bids: List[Tuple[str, int]]) -> int:
+    return compute_winnings(compute_ranking(list(hands_and_bids)))
+
+
+def part2(hands_and_bids: List[Tuple[str, int]]) -> int:
+    return compute_winnings(compute_ranking(list(hands_and_bids), jokerify=True))
+
+
 def main():
     path = Path(__file__).parent / "input.txt"
     hands_and_bids = read_input(path)
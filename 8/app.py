@@ -1,6 +1,7 @@
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, List, NamedTuple, Optional, Tuple
 from math import gcd
+import itertools
 
 
 def read_input(path: Path) -> List[str]:
@@ -41,6 +42,118 @@ def num_steps_to_traverse(
     return len(steps) - 1
 
 
+class CompiledGraph(NamedTuple):
+    names: Tuple[str, ...]
+    name_to_index: Dict[str, int]
+    left: Tuple[int, ...]
+    right: Tuple[int, ...]
+
+
+def compile_graph(graph: Dict[str, Dict[str, str]]) -> CompiledGraph:
+    names = tuple(graph.keys())
+    name_to_index = {name: i for i, name in enumerate(names)}
+    return CompiledGraph(
+        names=names,
+        name_to_index=name_to_index,
+        left=tuple(name_to_index[graph[name]["L"]] for name in names),
+        right=tuple(name_to_index[graph[name]["R"]] for name in names),
+    )
+
+
+class PassJumpTable(NamedTuple):
+    # jumps[k][node] is the node reached after 2**k passes over the commands,
+    # reaches_end[k][node] tells whether the end was hit during those passes
+    jumps: List[Tuple[int, ...]]
+    reaches_end: List[Tuple[bool, ...]]
+    # step within the first pass at which the end is hit, or None
+    first_end_step: Tuple[Optional[int], ...]
+
+
+def walk_single_pass(
+    commands: str, compiled: CompiledGraph, node: int, end: int
+) -> Tuple[int, Optional[int]]:
+    first_end_step = None
+    for step, c in enumerate(commands, start=1):
+        node = compiled.left[node] if c == "L" else compiled.right[node]
+        if first_end_step is None and node == end:
+            first_end_step = step
+    return node, first_end_step
+
+
+def build_pass_jump_table(
+    commands: str, compiled: CompiledGraph, end: str = "ZZZ", num_levels: int = 48
+) -> PassJumpTable:
+    end_index = compiled.name_to_index[end]
+    single_passes = [
+        walk_single_pass(commands, compiled, node, end_index)
+        for node in range(len(compiled.names))
+    ]
+    jumps = [tuple(node for node, _ in single_passes)]
+    first_end_step = tuple(step for _, step in single_passes)
+    reaches_end = [tuple(step is not None for step in first_end_step)]
+    for _ in range(num_levels - 1):
+        jump, reach = jumps[-1], reaches_end[-1]
+        jumps.append(tuple(jump[jump[node]] for node in range(len(jump))))
+        reaches_end.append(
+            tuple(reach[node] or reach[jump[node]] for node in range(len(jump)))
+        )
+    return PassJumpTable(jumps, reaches_end, first_end_step)
+
+
+def walk_compiled(
+    commands: str, compiled: CompiledGraph, start: str = "AAA", end: str = "ZZZ"
+) -> int:
+    # same walk as num_steps_to_traverse without keeping the visited nodes
+    node = compiled.name_to_index[start]
+    end_index = compiled.name_to_index[end]
+    num_steps = 0
+    for c in itertools.cycle(commands):
+        node = compiled.left[node] if c == "L" else compiled.right[node]
+        num_steps += 1
+        if node == end_index:
+            return num_steps
+
+
+def num_steps_to_traverse_compiled(
+    commands: str,
+    compiled: CompiledGraph,
+    table: PassJumpTable,
+    start: str = "AAA",
+) -> int:
+    # skip whole blocks of passes that never hit the end, largest first
+    node = compiled.name_to_index[start]
+    num_passes = 0
+    for level in reversed(range(len(table.jumps))):
+        if not table.reaches_end[level][node]:
+            node = table.jumps[level][node]
+            num_passes += 2**level
+    if table.first_end_step[node] is None:
+        raise ValueError(f"End not reached within {num_passes} passes")
+    return num_passes * len(commands) + table.first_end_step[node]
+
+
+def node_after_steps(
+    commands: str,
+    compiled: CompiledGraph,
+    table: PassJumpTable,
+    num_steps: int,
+    start: str = "AAA",
+) -> str:
+    num_passes, remaining_steps = divmod(num_steps, len(commands))
+    if num_passes >= 2 ** len(table.jumps):
+        raise ValueError("Jump table has too few levels for this many steps")
+    node = compiled.name_to_index[start]
+    level = 0
+    while num_passes > 0:
+        if num_passes & 1:
+            node = table.jumps[level][node]
+        num_passes >>= 1
+        level += 1
+    for c in commands[:remaining_steps]:
+        node = compiled.left[node] if c == "L" else compiled.right[node]
+    return compiled.names[node]
+
+
 def find_lcm(numbers: List[int]) -> int:
     lcm = 1
     for i in numbers:
@@ -70,12 +183,112 @@ def num_steps_to_parallel_traverse(
     return find_lcm(num_steps)
 
 
+class TraversalCycle(NamedTuple):
+    # steps are counted from the start node, the walk repeats every
+    # cycle_length steps once tail_length steps are done
+    tail_length: int
+    cycle_length: int
+    tail_hits: Tuple[int, ...]
+    cycle_hits: Tuple[int, ...]
+
+    def hits(self, step: int) -> bool:
+        if step < self.tail_length:
+            return step in self.tail_hits
+        offset = (step - self.tail_length) % self.cycle_length
+        return self.tail_length + offset in self.cycle_hits
+
+
+def find_traversal_cycle(
+    commands: str, graph: Dict[str, Dict[str, str]], start: str, end_suffix: str = "Z"
+) -> TraversalCycle:
+    # a state is (node, command index), the first repeated state closes the cycle
+    state_to_step = {}
+    hits = []
+    current_node = start
+    step = 0
+    while (current_node, step % len(commands)) not in state_to_step:
+        state_to_step[(current_node, step % len(commands))] = step
+        if step > 0 and current_node.endswith(end_suffix):
+            hits.append(step)
+        current_node = graph[current_node][commands[step % len(commands)]]
+        step += 1
+    tail_length = state_to_step[(current_node, step % len(commands))]
+    return TraversalCycle(
+        tail_length=tail_length,
+        cycle_length=step - tail_length,
+        tail_hits=tuple(h for h in hits if h < tail_length),
+        cycle_hits=tuple(h for h in hits if h >= tail_length),
+    )
+
+
+def combine_congruences(
+    r1: int, m1: int, r2: int, m2: int
+) -> Optional[Tuple[int, int]]:
+    # solve x = r1 mod m1 and x = r2 mod m2 for moduli that need not be coprime
+    g = gcd(m1, m2)
+    if (r2 - r1) % g != 0:
+        return None
+    lcm = m1 // g * m2
+    k = (r2 - r1) // g * pow(m1 // g, -1, m2 // g) % (m2 // g)
+    return (r1 + k * m1) % lcm, lcm
+
+
+def num_steps_to_parallel_traverse_exact(
+    commands: str,
+    graph: Dict[str, Dict[str, str]],
+    start_suffix: str = "A",
+    end_suffix: str = "Z",
+) -> int:
+    cycles = [
+        find_traversal_cycle(commands, graph, start, end_suffix)
+        for start in graph.keys()
+        if start.endswith(start_suffix)
+    ]
+
+    # before every walk is inside its cycle, a common step must be a tail hit
+    tail_candidates = sorted({h for c in cycles for h in c.tail_hits})
+    for step in tail_candidates:
+        if all(c.hits(step) for c in cycles):
+            return step
+
+    # afterwards each walk hits on fixed residues modulo its cycle length
+    min_step = max(c.tail_length for c in cycles)
+    congruences = [(0, 1)]
+    for c in cycles:
+        residues = {h % c.cycle_length for h in c.cycle_hits}
+        congruences = [
+            combined
+            for r, m in congruences
+            for residue in residues
+            if (combined := combine_congruences(r, m, residue, c.cycle_length))
+            is not None
+        ]
+    if len(congruences) == 0:
+        raise ValueError("The walks never end on an end node at the same step")
+    return min(min_step + (r - min_step) % m for r, m in congruences)
+
+
+def parse(path: Path) -> Tuple[str, Dict[str, Dict[str, str]]]:
+    return read_input(path)
+
+
+def part1(parsed: Tuple[str, Dict[str, Dict[str, str]]]) -> int:
+    # a single short walk, the jump table only pays off for long traversals
+    commands, graph = parsed
+    return walk_compiled(commands, compile_graph(graph))
+
+
+def part2(parsed: Tuple[str, Dict[str, Dict[str, str]]]) -> int:
+    commands, graph = parsed
+    return num_steps_to_parallel_traverse_exact(commands, graph)
+
+
 def main():
     path = Path(__file__).parent / "input.txt"
     commands, graph = read_input(path)
     # print(num_steps_to_traverse(commands, graph))
 
-    print(num_steps_to_parallel_traverse(commands, graph))
+    print(num_steps_to_parallel_traverse_exact(commands, graph))
 
 
 if __name__ == "__main__":
@@ -1,6 +1,8 @@
 from pathlib import Path
 from typing import Generator, Iterable, List, Tuple
-from math import ceil, floor
+from math import ceil, comb, floor
+import itertools
+import numpy as np
 
 
 def read_input(path: Path):
@@ -27,12 +29,78 @@ def extrapolate(values: Iterable[int], reverse: bool = False) -> int:
     return sum(lasts)
 
 
+def extrapolation_weights(length: int, reverse: bool = False) -> List[int]:
+    # the n-th difference of a sequence of degree < n is zero, so the next
+    # value is a signed binomial combination of the known ones
+    if reverse:
+        return [(-1) ** i * comb(length, i + 1) for i in range(length)]
+    return [(-1) ** (length - 1 - i) * comb(length, i) for i in range(length)]
+
+
+def extrapolate_array(values: np.ndarray, reverse: bool = False) -> np.ndarray:
+    # values holds one sequence per row, all of the same length
+    weights = extrapolation_weights(values.shape[1], reverse=reverse)
+    max_abs_value = int(np.abs(values).max()) if values.size > 0 else 0
+    bound = sum(abs(w) for w in weights) * max_abs_value
+    if bound < np.iinfo(np.int64).max:
+        return values.astype(np.int64) @ np.array(weights, dtype=np.int64)
+    # fall back to python ints when int64 could overflow
+    return values.astype(object) @ np.array(weights, dtype=object)
+
+
+def extrapolate_batch(
+    sequences: Iterable[Tuple[int, ...]], reverse: bool = False
+) -> List[int]:
+    # sequences of the same length are extrapolated in one product
+    sequences = tuple(sequences)
+    length_to_indices = {}
+    for i, sequence in enumerate(sequences):
+        length_to_indices.setdefault(len(sequence), []).append(i)
+    extrapolated = [0] * len(sequences)
+    for indices in length_to_indices.values():
+        values = np.array([sequences[i] for i in indices], dtype=object)
+        for i, value in zip(indices, extrapolate_array(values, reverse=reverse)):
+            extrapolated[i] = int(value)
+    return extrapolated
+
+
+def parse(path: Path) -> Tuple[Tuple[int, ...], ...]:
+    return read_input(path)
+
+
+def save_parsed(values: Tuple[Tuple[int, ...], ...], path: Path) -> None:
+    # the sequences one after the other in the smallest integer type that
+    # holds them, with their lengths to split them
+    lengths = np.array([len(v) for v in values], dtype=np.int64)
+    flat = np.array([x for v in values for x in v], dtype=np.int64)
+    if len(flat) > 0:
+        # a negative bound gives a signed type
+        flat = flat.astype(np.min_scalar_type(-int(np.abs(flat).max()) - 1))
+    with open(path, "wb") as f:
+        np.savez(f, values=flat, lengths=lengths)
+
+
+def load_parsed(path: Path) -> Tuple[Tuple[int, ...], ...]:
+    with np.load(path) as data:
+        flat, lengths = data["values"].tolist(), data["lengths"].tolist()
+    ends = list(itertools.accumulate(lengths))
+    return tuple(tuple(flat[end - length : end]) for end, length in zip(ends, lengths))
+
+
+def part1(values: Tuple[Tuple[int, ...], ...]) -> int:
+    return sum(extrapolate_batch(values))
+
+
+def part2(values: Tuple[Tuple[int, ...], ...]) -> int:
+    return sum(extrapolate_batch(values, reverse=True))
+
+
 def main():
     path = Path(__file__).parent / "input.txt"
     values = read_input(path)
-    print(sum(extrapolate(v) for v in values))
+    print(sum(extrapolate_batch(values)))
 
-    print(sum(extrapolate(v, reverse=True) for v in values))
+    print(sum(extrapolate_batch(values, reverse=True)))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,279 @@
+from argparse import ArgumentParser
+import json
+import re
+import tempfile
+import tracemalloc
+from pathlib import Path
+from time import perf_counter
+from types import ModuleType
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+from generate import generate_input
+from run import discover_days, load_day, root
+
+# the checked-in file each day's inputs are scaled from
+base_inputs = {
+    "1": "input.txt",
+    "2": "input.txt",
+    "3": "easy.txt",
+    "4": "easy.txt",
+    "5": "easy.txt",
+    "6": "input.txt",
+    "7": "ez.txt",
+    "8": "input.txt",
+    "9": "ez.txt",
+}
+
+
+def repeat_lines(text: str, factor: int) -> str:
+    return "\n".join(text.strip().splitlines() * factor) + "\n"
+
+
+def repeat_cards(text: str, factor: int) -> str:
+    # cards are renumbered so ids stay unique and consecutive
+    cards = [line.split(":")[1] for line in text.strip().splitlines()]
+    return "".join(f"Card {i + 1}:{card}\n" for i, card in enumerate(cards * factor))
+
+
+def repeat_seeds(text: str, factor: int) -> str:
+    seeds, mappings = text.split("\n\n", 1)
+    # read_rows expects the seed values on the line after the title
+    title, seed_values = seeds.split(":")
+    return f"{title}: \n{' '.join([seed_values.strip()] * factor)}\n\n{mappings}"
+
+
+def repeat_races(text: str, factor: int) -> str:
+    return "".join(
+        f"{title}: {' '.join(values.split() * factor)}\n"
+        for title, values in (line.split(":") for line in text.strip().splitlines())
+    )
+
+
+def repeat_network(text: str, factor: int) -> str:
+    # copies of the network get a numeric prefix, which keeps the A/Z suffixes
+    commands, nodes = text.strip().split("\n\n")
+    copies = [nodes]
+    for i in range(1, factor):
+        copies.append(re.sub(r"\b(\w+)\b", rf"{i}\1", nodes))
+    return commands + "\n\n" + "\n".join(copies) + "\n"
+
+
+scalers: Dict[str, Callable[[str, int], str]] = {
+    "1": repeat_lines,
+    "2": repeat_lines,
+    "3": repeat_lines,
+    "4": repeat_cards,
+    "5": repeat_seeds,
+    "6": repeat_races,
+    "7": repeat_lines,
+    "8": repeat_network,
+    "9": repeat_lines,
+}
+
+
+def scale_input(
+    day: str, factor: int, directory: Path, synthetic_size: Optional[int] = None
+) -> Path:
+    # synthetic inputs hold synthetic_size * factor records
+    path = directory / f"day{day}_x{factor}.txt"
+    if synthetic_size is not None:
+        return generate_input(day, synthetic_size * factor, path)
+    text = (root / day / base_inputs[day]).read_text()
+    path.write_text(scalers[day](text, factor))
+    return path
+
+
+def small_answer_seed_pairs(
+    module: ModuleType, chain_of_mappings: Any, max_location: int = 10**3
+) -> List[int]:
+    # seed pairs covering every id that reaches a location in
+    # [max_location // 2, max_location), a query the reverse scan can answer
+    compiled_chain = module.compile_chain_of_mappings(chain_of_mappings)
+    seed_pairs = []
+    for piece, offset in module.compose_mapping_pieces(
+        [module.IdRange(0, 2**64)], compiled_chain
+    ):
+        start = max(piece.start, max_location // 2 - offset)
+        end = min(piece.end, max_location - offset)
+        if start < end:
+            seed_pairs.extend((start, end - start))
+    return seed_pairs
+
+
+def compile_network(module: ModuleType, commands: str, graph: Any) -> Any:
+    compiled = module.compile_graph(graph)
+    table = module.build_pass_jump_table(commands, compiled)
+    return commands, graph, compiled, table
+
+
+# inputs of the extra benchmarks of a day, derived once from its parsed input
+extra_inputs: Dict[str, Callable[[ModuleType, Any], Any]] = {
+    "5": lambda m, p: (p[0], p[1], small_answer_seed_pairs(m, p[1])),
+    "8": lambda m, p: compile_network(m, *p),
+}
+
+# public functions benchmarked on top of parse/part1/part2, called with
+# the day module and the parsed input, or its extra input when there is one
+extra_benchmarks: Dict[str, Dict[str, Callable[[ModuleType, Any], Any]]] = {
+    "3": {
+        "find_gear_ratios": lambda m, p: m.find_gear_ratios(
+            m.find_gears(p[0]), p[1], p[0], p[2]
+        ),
+    },
+    "4": {
+        "compute_num_card_visits": lambda m, p: m.compute_num_card_visits(
+            m.compute_win_tree(dict(zip(p[0].tolist(), p[1].tolist())))
+        ),
+    },
+    "5": {
+        "compute_min_location_of_seeds": lambda m, p: m.compute_min_location_of_seeds(
+            p[0], p[1]
+        ),
+        "min_location_ranges": lambda m, p: m.compute_min_location(p[0], p[1]),
+        "min_location_inverse_breakpoints": lambda m, p: m.compute_min_location(
+            p[0], p[1], strategy="inverse_breakpoints"
+        ),
+        # all strategies on seeds with a small answer, which the reverse scan
+        # needs to finish
+        "small_answer_ranges": lambda m, p: m.compute_min_location(p[2], p[1]),
+        "small_answer_inverse_breakpoints": lambda m, p: m.compute_min_location(
+            p[2], p[1], strategy="inverse_breakpoints"
+        ),
+        "small_answer_reverse_scan": lambda m, p: m.compute_min_location(
+            p[2], p[1], strategy="reverse_scan"
+        ),
+    },
+    "7": {
+        "compute_ranking": lambda m, hands_and_bids: m.compute_ranking(
+            list(hands_and_bids)
+        ),
+    },
+    "8": {
+        "compile_graph": lambda m, p: m.compile_graph(p[1]),
+        "build_pass_jump_table": lambda m, p: m.build_pass_jump_table(p[0], p[2]),
+        "num_steps_to_traverse_compiled": lambda m, p: m.num_steps_to_traverse_compiled(
+            p[0], p[2], p[3]
+        ),
+        "node_after_steps": lambda m, p: m.node_after_steps(p[0], p[2], p[3], 10**12),
+    },
+}
+
+
+class Measurement(NamedTuple):
+    seconds: float
+    peak_bytes: int
+
+
+def measure(f: Callable[[], Any], repeats: int = 3) -> Measurement:
+    # an untraced run first fills process wide caches, so their one time cost
+    # lands on no measurement. The timed runs are done without tracemalloc,
+    # which slows allocations down a lot.
+    f()
+    tracemalloc.start()
+    try:
+        f()
+        _, peak_bytes = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    seconds = float("inf")
+    for _ in range(repeats):
+        start = perf_counter()
+        f()
+        seconds = min(seconds, perf_counter() - start)
+    return Measurement(seconds=seconds, peak_bytes=peak_bytes)
+
+
+def benchmark_day(
+    day: str,
+    factors: List[int],
+    directory: Path,
+    repeats: int = 3,
+    synthetic_size: Optional[int] = None,
+) -> Dict[str, Any]:
+    module = load_day(day)
+    # the input source is part of the keys, so runs on scaled and synthetic
+    # inputs, or on synthetic inputs of another size, are never compared
+    source = "scaled" if synthetic_size is None else f"synthetic{synthetic_size}"
+    results = {}
+    for factor in factors:
+        path = scale_input(day, factor, directory, synthetic_size)
+        parsed = module.parse(path)
+        functions = {
+            "parse": lambda: module.parse(path),
+            "part1": lambda: module.part1(parsed),
+            "part2": lambda: module.part2(parsed),
+        }
+        extra_input = parsed
+        if day in extra_inputs:
+            extra_input = extra_inputs[day](module, parsed)
+        for name, f in extra_benchmarks.get(day, {}).items():
+            functions[name] = lambda f=f: f(module, extra_input)
+        for name, f in functions.items():
+            results[f"{day}/{name}/{source}/x{factor}"] = measure(f, repeats)._asdict()
+    return results
+
+
+def find_regressions(
+    results: Dict[str, Any], baseline: Dict[str, Any], threshold: float
+) -> List[str]:
+    regressions = []
+    for key, result in results.items():
+        if key not in baseline:
+            continue
+        for metric in Measurement._fields:
+            before, after = baseline[key][metric], result[metric]
+            if before > 0 and after > before * (1 + threshold):
+                regressions.append(
+                    f"{key} {metric}: {before:.6g} -> {after:.6g} "
+                    f"(+{(after / before - 1) * 100:.0f}%)"
+                )
+    return regressions
+
+
+def main():
+    parser = ArgumentParser(description="Benchmark the days on scaled inputs.")
+    parser.add_argument("days", nargs="*", help="days to run, all when omitted")
+    parser.add_argument("--steps", type=int, default=4, help="number of sizes")
+    parser.add_argument("--growth", type=int, default=4, help="size ratio per step")
+    parser.add_argument("--repeats", type=int, default=3, help="best of timings")
+    parser.add_argument(
+        "--synthetic",
+        type=int,
+        metavar="SIZE",
+        help="use generated inputs of SIZE records at the smallest step",
+    )
+    parser.add_argument("--save", type=Path, help="write the results to this file")
+    parser.add_argument("--compare", type=Path, help="baseline results to compare")
+    parser.add_argument(
+        "--threshold", type=float, default=0.2, help="allowed relative slowdown"
+    )
+    args = parser.parse_args()
+
+    days = args.days or [day for day in discover_days() if day in base_inputs]
+    factors = [args.growth**i for i in range(args.steps)]
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for day in days:
+            results.update(
+                benchmark_day(
+                    day, factors, Path(directory), args.repeats, args.synthetic
+                )
+            )
+
+    for key, result in results.items():
+        print(f"{key:<60} {result['seconds']:>12.6f}s {result['peak_bytes']:>14,}B")
+    if args.save:
+        args.save.write_text(json.dumps(results, indent=2))
+    if args.compare:
+        baseline = json.loads(args.compare.read_text())
+        if not results.keys() & baseline.keys():
+            raise SystemExit(f"{args.compare} holds no measurement of these inputs")
+        regressions = find_regressions(results, baseline, args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
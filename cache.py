@@ -0,0 +1,78 @@
+import hashlib
+from contextlib import suppress
+import os
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Optional
+
+default_cache_dir = Path(__file__).parent / ".cache" / "parsed"
+default_max_bytes = 512 * 2**20
+
+
+def file_digest(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(2**20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def cache_key(day: str, module: ModuleType, path: Path) -> str:
+    # the parser version is the source of the day's app.py, so any change to
+    # the parsing code invalidates its entries
+    parser_version = file_digest(Path(module.__file__))[:16]
+    return f"day{day}-{parser_version}-{file_digest(path)[:32]}"
+
+
+def evict(cache_dir: Path, max_bytes: int) -> None:
+    # least recently used entries go first, loads refresh the modification time.
+    # Other processes may evict at the same time, entries that vanish in
+    # between are skipped.
+    entries = []
+    for entry in cache_dir.glob("*.npz"):
+        try:
+            stat = entry.stat()
+        except FileNotFoundError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, entry))
+    entries.sort()
+    total = sum(size for _, size, _ in entries)
+    for _, size, entry in entries:
+        if total <= max_bytes:
+            break
+        total -= size
+        entry.unlink(missing_ok=True)
+
+
+def cached_parse(
+    day: str,
+    module: ModuleType,
+    path: Path,
+    use_cache: bool = True,
+    cache_dir: Optional[Path] = None,
+    max_bytes: int = default_max_bytes,
+) -> Any:
+    # only days with a compact form of their parsed input, that loads faster
+    # than it parses, opt in by defining save_parsed and load_parsed
+    if not use_cache or not hasattr(module, "load_parsed"):
+        return module.parse(path)
+    cache_dir = cache_dir or default_cache_dir
+    entry = cache_dir / f"{cache_key(day, module, path)}.npz"
+    # an entry evicted by another process in the meantime is a miss
+    try:
+        parsed = module.load_parsed(entry)
+    except FileNotFoundError:
+        pass
+    else:
+        with suppress(FileNotFoundError):
+            os.utime(entry)
+        return parsed
+
+    parsed = module.parse(path)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    # written aside and renamed, so concurrent runs never read half an entry
+    partial_entry = entry.with_suffix(f".{os.getpid()}.tmp")
+    module.save_parsed(parsed, partial_entry)
+    partial_entry.replace(entry)
+    evict(cache_dir, max_bytes)
+    return parsed
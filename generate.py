@@ -0,0 +1,216 @@
+from argparse import ArgumentParser
+import random
+import string
+from pathlib import Path
+from typing import Callable, Dict, Iterator
+
+digit_words = ["one", "two", "three", "four", "five", "six", "seven", "eight", "nine"]
+symbols = "*#+$/@%&=-"
+cards = "23456789TJQKA"
+almanac_sections = [
+    "seed-to-soil",
+    "soil-to-fertilizer",
+    "fertilizer-to-water",
+    "water-to-light",
+    "light-to-temperature",
+    "temperature-to-humidity",
+    "humidity-to-location",
+]
+
+# every generator yields the lines of an input with `size` records:
+# lines, games, schematic rows, cards, ranges per map, races, hands,
+# network nodes or sequences
+
+
+def calibration_lines(size: int, rng: random.Random) -> Iterator[str]:
+    for _ in range(size):
+        tokens = [str(rng.randint(1, 9))]
+        for _ in range(rng.randint(1, 8)):
+            roll = rng.random()
+            if roll < 0.2:
+                tokens.append(str(rng.randint(1, 9)))
+            elif roll < 0.5:
+                tokens.append(rng.choice(digit_words))
+            else:
+                tokens.append(rng.choice(string.ascii_lowercase))
+        rng.shuffle(tokens)
+        yield "".join(tokens)
+
+
+def game_lines(size: int, rng: random.Random) -> Iterator[str]:
+    for id in range(1, size + 1):
+        draws = []
+        for _ in range(rng.randint(1, 6)):
+            colours = rng.sample(["red", "green", "blue"], rng.randint(1, 3))
+            draws.append(", ".join(f"{rng.randint(1, 20)} {c}" for c in colours))
+        yield f"Game {id}: {'; '.join(draws)}"
+
+
+def schematic_lines(size: int, rng: random.Random, width: int = 140) -> Iterator[str]:
+    for _ in range(size):
+        row = []
+        while len(row) < width:
+            roll = rng.random()
+            if roll < 0.15:
+                row.extend(str(rng.randint(1, 999)))
+                row.append(".")
+            elif roll < 0.22:
+                row.append(rng.choice(symbols))
+            else:
+                row.append(".")
+        yield "".join(row[:width])
+
+
+def card_lines(
+    size: int,
+    rng: random.Random,
+    num_winning: int = 10,
+    num_chosen: int = 25,
+) -> Iterator[str]:
+    # mostly losing cards keep the number of copies from exploding
+    for id in range(1, size + 1):
+        numbers = rng.sample(range(1, 100), num_winning + num_chosen)
+        winning = numbers[:num_winning]
+        num_matches = 0 if rng.random() < 0.7 else rng.randint(1, 4)
+        num_matches = min(num_matches, size - id)
+        chosen = winning[:num_matches] + numbers[num_winning + num_matches :]
+        rng.shuffle(chosen)
+        yield (
+            f"Card {id:>{len(str(size))}}: "
+            + " ".join(f"{n:>2}" for n in winning)
+            + " | "
+            + " ".join(f"{n:>2}" for n in chosen)
+        )
+
+
+def almanac_lines(
+    size: int, rng: random.Random, num_seed_pairs: int = 10, max_id: int = 2**32
+) -> Iterator[str]:
+    yield "seeds: "
+    seeds = []
+    for _ in range(num_seed_pairs):
+        start = rng.randrange(max_id // 2)
+        seeds.extend((start, rng.randint(1, max_id // (4 * num_seed_pairs))))
+    yield " ".join(str(s) for s in seeds)
+    for section in almanac_sections:
+        yield ""
+        yield f"{section} map:"
+        # non overlapping source ranges with gaps, in random order
+        cuts = sorted(rng.sample(range(1, max_id), 2 * size))
+        ranges = list(zip(cuts[::2], cuts[1::2]))
+        rng.shuffle(ranges)
+        for source, end in ranges:
+            destination = rng.randrange(max_id - (end - source))
+            yield f"{destination} {source} {end - source}"
+
+
+def race_lines(size: int, rng: random.Random) -> Iterator[str]:
+    times = [rng.randint(10, 100) for _ in range(size)]
+    distances = [rng.randint(1, t * t // 4 - 1) for t in times]
+    yield "Time:     " + " ".join(f"{t:>5}" for t in times)
+    yield "Distance: " + " ".join(f"{d:>5}" for d in distances)
+
+
+def hand_lines(size: int, rng: random.Random) -> Iterator[str]:
+    for _ in range(size):
+        yield f"{''.join(rng.choices(cards, k=5))} {rng.randint(1, 1000)}"
+
+
+def node_name(index: int, suffix: str) -> str:
+    # at least three letters from the index, the suffix marks start and end
+    # nodes so it is kept out of the other letters
+    letters = string.ascii_uppercase[1:25]
+    name = []
+    while index > 0 or len(name) < 3:
+        index, letter = divmod(index, len(letters))
+        name.append(letters[letter])
+    return "".join(name) + suffix
+
+
+def network_lines(
+    size: int, rng: random.Random, num_commands: int = 263, num_ghosts: int = 6
+) -> Iterator[str]:
+    # every ghost walks from its start into a loop of m * num_commands nodes
+    # holding one end node, m is a distinct small prime. All end nodes sit at
+    # the same command index, otherwise the ghosts never meet on end nodes.
+    # The loops come first, so the network can be larger than size.
+    yield "".join(rng.choices("LR", k=num_commands))
+    yield ""
+    primes = [2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37]
+    end_command_index = rng.randrange(num_commands)
+    index = 0
+    for ghost, multiple in enumerate(rng.sample(primes, num_ghosts)):
+        loop_length = multiple * num_commands
+        end_position = end_command_index + rng.randrange(multiple) * num_commands
+        loop = []
+        for position in range(loop_length):
+            if position == end_position:
+                loop.append("ZZZ" if ghost == 0 else node_name(index, "Z"))
+            else:
+                loop.append(node_name(index, "X"))
+            index += 1
+        start = "AAA" if ghost == 0 else node_name(index, "A")
+        index += 1
+        yield f"{start} = ({loop[0]}, {loop[0]})"
+        for position, node in enumerate(loop):
+            next_node = loop[(position + 1) % loop_length]
+            yield f"{node} = ({next_node}, {next_node})"
+    # unreachable filler nodes that only point at each other
+    first_filler = index
+    for index in range(first_filler, size):
+        left, right = (
+            node_name(rng.randrange(first_filler, size), "Y") for _ in range(2)
+        )
+        yield f"{node_name(index, 'Y')} = ({left}, {right})"
+
+
+def sequence_lines(
+    size: int, rng: random.Random, length: int = 21, max_degree: int = 6
+) -> Iterator[str]:
+    for _ in range(size):
+        coefficients = [
+            rng.randint(-9, 9) for _ in range(rng.randint(1, max_degree + 1))
+        ]
+        yield " ".join(
+            str(sum(c * x**k for k, c in enumerate(coefficients)))
+            for x in range(length)
+        )
+
+
+generators: Dict[str, Callable[[int, random.Random], Iterator[str]]] = {
+    "1": calibration_lines,
+    "2": game_lines,
+    "3": schematic_lines,
+    "4": card_lines,
+    "5": almanac_lines,
+    "6": race_lines,
+    "7": hand_lines,
+    "8": network_lines,
+    "9": sequence_lines,
+}
+
+
+def generate_input(day: str, size: int, path: Path, seed: int = 2023) -> Path:
+    # lines are written as they are generated, without a trailing newline
+    # since day 5 does not accept one
+    rng = random.Random(seed)
+    with open(path, "w") as f:
+        for i, line in enumerate(generators[day](size, rng)):
+            if i > 0:
+                f.write("\n")
+            f.write(line)
+    return path
+
+
+def main():
+    parser = ArgumentParser(description="Write a synthetic puzzle input.")
+    parser.add_argument("day", choices=sorted(generators, key=int))
+    parser.add_argument("output", type=Path)
+    parser.add_argument("--size", type=int, default=1000, help="number of records")
+    parser.add_argument("--seed", type=int, default=2023)
+    args = parser.parse_args()
+    generate_input(args.day, args.size, args.output, args.seed)
+
+
+if __name__ == "__main__":
+    main()
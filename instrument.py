@@ -0,0 +1,87 @@
+import functools
+import json
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+from time import perf_counter
+from types import ModuleType
+from typing import Any, Callable, Dict, Iterable, Iterator, List
+
+
+class Recorder:
+    # wall time, call count and tracemalloc peak per phase, the peak being
+    # measured above the memory in use when the phase starts. Nothing is
+    # measured unless a function is wrapped or a phase is entered, so
+    # uninstrumented code runs at full speed.
+    def __init__(self) -> None:
+        self.stats: Dict[str, Dict[str, Any]] = {}
+        # for every open phase, the highest peak seen by the phases it contains
+        self.child_peaks: List[int] = []
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        # tracing is stopped again by the phase that started it, so it is
+        # off outside the outermost phase
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        start_memory, outer_peak = tracemalloc.get_traced_memory()
+        if self.child_peaks:
+            self.child_peaks[-1] = max(self.child_peaks[-1], outer_peak)
+        tracemalloc.reset_peak()
+        self.child_peaks.append(0)
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            seconds = perf_counter() - start
+            peak = max(tracemalloc.get_traced_memory()[1], self.child_peaks.pop())
+            if self.child_peaks:
+                self.child_peaks[-1] = max(self.child_peaks[-1], peak)
+            stats = self.stats.setdefault(
+                name, {"calls": 0, "seconds": 0.0, "peak_bytes": 0}
+            )
+            stats["calls"] += 1
+            stats["seconds"] += seconds
+            stats["peak_bytes"] = max(stats["peak_bytes"], peak - start_memory)
+            if started_tracing:
+                tracemalloc.stop()
+
+    def wrap(self, f: Callable, name: str) -> Callable:
+        @functools.wraps(f)
+        def wrapped(*args, **kwargs):
+            with self.phase(name):
+                return f(*args, **kwargs)
+
+        return wrapped
+
+    def instrument_module(self, module: ModuleType, names: Iterable[str]) -> None:
+        # calls inside the module go through its globals, so replacing the
+        # attributes also measures the calls the module makes itself
+        for name in names:
+            setattr(module, name, self.wrap(getattr(module, name), name))
+
+    def report(self) -> Dict[str, Dict[str, Any]]:
+        return {name: dict(stats) for name, stats in self.stats.items()}
+
+    def write_json(self, path: Path) -> None:
+        path.write_text(json.dumps(self.report(), indent=2))
+
+
+# functions worth a phase of their own, next to parse/part1/part2
+profiled_functions = {
+    "1": [],
+    "2": ["read_game_columns", "compute_feasible_id_sums"],
+    "3": ["read_rows", "find_numbers", "build_number_index", "find_gear_ratios"],
+    "4": ["read_card_columns", "compute_match_counts", "compute_num_card_copies"],
+    "5": ["read_rows", "compile_chain_of_mappings", "map_seed_ids"],
+    "6": ["read_input", "compute_number_of_ways_to_win_exact"],
+    "7": ["read_input", "build_hand_type_table", "compute_ranking"],
+    "8": [
+        "read_input",
+        "walk_compiled",
+        "find_traversal_cycle",
+        "num_steps_to_parallel_traverse_exact",
+    ],
+    "9": ["read_input", "extrapolate_batch"],
+}
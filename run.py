@@ -0,0 +1,147 @@
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
+import csv
+import importlib.util
+import json
+import sys
+from pathlib import Path
+from time import perf_counter
+from types import ModuleType
+from typing import Any, Dict, List, Optional
+
+from cache import cached_parse
+from instrument import Recorder, profiled_functions
+
+root = Path(__file__).parent
+phases = ("parse", "part1", "part2")
+
+
+def discover_days() -> List[str]:
+    # every numbered directory with an app.py exposing parse/part1/part2
+    return sorted(
+        (p.parent.name for p in root.glob("*/app.py") if p.parent.name.isdigit()),
+        key=int,
+    )
+
+
+def load_day(day: str) -> ModuleType:
+    path = root / day / "app.py"
+    spec = importlib.util.spec_from_file_location(f"day{day}_app", path)
+    module = importlib.util.module_from_spec(spec)
+    # registered so functions and classes of the day can be pickled, to
+    # hand them to a process pool
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def run_day(
+    day: str,
+    input_path: Optional[Path] = None,
+    use_cache: bool = True,
+    profile: bool = False,
+) -> Dict[str, Any]:
+    module = load_day(day)
+    input_path = input_path or root / day / "input.txt"
+    row = {"day": day, "input": str(input_path)}
+    recorder = Recorder()
+    if profile:
+        recorder.instrument_module(
+            module, list(phases) + profiled_functions.get(day, [])
+        )
+
+    # wall times are left out when profiling, the wrapped functions run
+    # under tracemalloc and the report holds their times instead
+    start = perf_counter()
+    parsed = cached_parse(day, module, input_path, use_cache=use_cache)
+    if not profile:
+        row["parse_seconds"] = perf_counter() - start
+    for part in phases[1:]:
+        start = perf_counter()
+        row[part] = getattr(module, part)(parsed)
+        if not profile:
+            row[f"{part}_seconds"] = perf_counter() - start
+    if profile:
+        row["phases"] = recorder.report()
+    return row
+
+
+def run_days(
+    days: List[str],
+    input_paths: Optional[Dict[str, Path]] = None,
+    num_workers: Optional[int] = None,
+    use_cache: bool = True,
+    profile: bool = False,
+) -> List[Dict[str, Any]]:
+    input_paths = input_paths or {}
+    with ProcessPoolExecutor(max_workers=num_workers) as executor:
+        return list(
+            executor.map(
+                run_day,
+                days,
+                [input_paths.get(day) for day in days],
+                [use_cache] * len(days),
+                [profile] * len(days),
+            )
+        )
+
+
+def write_table(rows: List[Dict[str, Any]], output_format: str) -> None:
+    if output_format == "json":
+        json.dump(rows, sys.stdout, indent=2)
+        print()
+    else:
+        writer = csv.DictWriter(
+            sys.stdout,
+            extrasaction="ignore",
+            fieldnames=["day", "input"]
+            + [f"{phase}_seconds" for phase in phases]
+            + list(phases[1:]),
+        )
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def main():
+    parser = ArgumentParser(description="Run the solvers of several days at once.")
+    parser.add_argument("days", nargs="*", help="days to run, all when omitted")
+    parser.add_argument(
+        "--input",
+        action="append",
+        default=[],
+        metavar="DAY=PATH",
+        help="use another input file for a day, can be repeated",
+    )
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument(
+        "--no-cache", action="store_true", help="always parse the input files"
+    )
+    parser.add_argument(
+        "--profile",
+        type=Path,
+        metavar="FILE",
+        help="write time, calls and peak memory per phase to FILE as JSON",
+    )
+    parser.add_argument("--format", choices=("csv", "json"), default="csv")
+    args = parser.parse_args()
+    # some answers on large generated inputs run to thousands of digits
+    if hasattr(sys, "set_int_max_str_digits"):
+        sys.set_int_max_str_digits(0)
+
+    days = args.days or discover_days()
+    input_paths = {}
+    for override in args.input:
+        day, path = override.split("=", 1)
+        input_paths[day] = Path(path)
+    rows = run_days(
+        days, input_paths, args.workers, not args.no_cache, args.profile is not None
+    )
+    if args.profile:
+        args.profile.write_text(
+            json.dumps({row["day"]: row.pop("phases") for row in rows}, indent=2)
+        )
+    write_table(rows, args.format)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,77 @@
+from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import List, Tuple
-from math import ceil, floor
+from typing import Any, Iterable, Iterator, Tuple
+from functools import cached_property
+import mmap
 
 
-def read_input(path: Path):
-    for line in path.read_text().splitlines():
-        print(line)
+class LineSource:
+    # lines are only read when iterated, straight from a memory map, so a
+    # parser that streams never holds the whole file
+    def __init__(self, path: Path):
+        self.path = path
+
+    def __iter__(self) -> Iterator[str]:
+        if self.path.stat().st_size == 0:
+            return
+        with open(self.path, "rb") as f, mmap.mmap(
+            f.fileno(), 0, access=mmap.ACCESS_READ
+        ) as mm:
+            for line in iter(mm.readline, b""):
+                yield line.decode().rstrip("\r\n")
+
+
+class Solver(ABC):
+    # subclasses implement part1 and part2, and parse unless the raw lines
+    # are enough. The hooks are static, so they can be called without a
+    # solver. The parsed input is computed once and shared by both parts.
+    def __init__(self, path: Path):
+        self.path = path
+
+    @cached_property
+    def parsed(self) -> Any:
+        return self.parse(LineSource(self.path))
+
+    @staticmethod
+    def parse(lines: Iterable[str]) -> Any:
+        return tuple(lines)
+
+    @staticmethod
+    @abstractmethod
+    def part1(parsed: Any) -> Any: ...
+
+    @staticmethod
+    @abstractmethod
+    def part2(parsed: Any) -> Any: ...
+
+    def solve(self) -> Tuple[Any, Any]:
+        return self.part1(self.parsed), self.part2(self.parsed)
+
+
+class DaySolver(Solver):
+    @staticmethod
+    def part1(lines: Tuple[str, ...]) -> Any:
+        return None
+
+    @staticmethod
+    def part2(lines: Tuple[str, ...]) -> Any:
+        return None
+
+
+# entry points used by run.py
+def parse(path: Path) -> Any:
+    return DaySolver(path).parsed
+
+
+part1 = DaySolver.part1
+part2 = DaySolver.part2
 
 
 def main():
     path = Path(__file__).parent / "input.txt"
-    race_records = read_input(path)
+    answer_part1, answer_part2 = DaySolver(path).solve()
+    print(f"part 1: {answer_part1}")
+    print(f"part 2: {answer_part2}")
 
 
 if __name__ == "__main__":